@@ -56,38 +56,63 @@ def add_common_commands(subparsers, efuses):
                 efuse_value_pairs[efuse_name] = check_arg(None)
             setattr(namespace, self.dest, efuse_value_pairs)
 
+    class ActionBlockDatafilePairs(argparse.Action):
+        def __init__(self, option_strings, dest, nargs=None, **kwargs):
+            self._choices = kwargs.get("block_choices")
+            del kwargs["block_choices"]
+            super(ActionBlockDatafilePairs, self).__init__(option_strings, dest, nargs=nargs, **kwargs)
+
+        def __call__(self, parser, namespace, values, option_string=None):
+            # values = [BLOCK DATAFILE BLOCK DATAFILE ...], the pairing is checked by the command
+            block_name_list = values[0::2]
+            for block_name in block_name_list:
+                if block_name not in self._choices:
+                    raise esptool.FatalError("Invalid the block name '{}'. Available the block names: {}".format(block_name, self._choices))
+            datafile_list = []
+            for datafile_name in values[1::2]:
+                try:
+                    datafile_list.append(argparse.FileType('rb')(datafile_name))
+                except argparse.ArgumentTypeError as e:
+                    raise esptool.FatalError(str(e))
+            setattr(namespace, self.dest, block_name_list)
+            setattr(namespace, "datafile", datafile_list)
+
+    efuse_names = [e.name for e in efuses.efuses]
+    rd_protect_names = [e.name for e in efuses.efuses if e.read_disable_bit is not None]
+    wr_protect_names = [e.name for e in efuses.efuses if e.write_disable_bit is not None]
+    burn_block_names = tuple(efuses.BURN_BLOCK_DATA_NAMES)
+
     burn = subparsers.add_parser('burn_efuse', help='Burn the efuse with the specified name')
     burn.add_argument('name_value_pairs', help='Name of efuse register and New value pairs to burn',
                       action=ActionEfuseValuePair,
                       nargs="+",
-                      metavar="[EFUSE_NAME VALUE] [{} VALUE".format(" VALUE] [".join([e.name for e in efuses.efuses])),
-                      efuse_choices=[e.name for e in efuses.efuses],
+                      metavar="[EFUSE_NAME VALUE] [{} VALUE".format(" VALUE] [".join(efuse_names)),
+                      efuse_choices=efuse_names,
                       efuses=efuses)
 
     read_protect_efuse = subparsers.add_parser('read_protect_efuse', help='Disable readback for the efuse with the specified name')
     read_protect_efuse.add_argument('efuse_name', help='Name of efuse register to burn', nargs="+",
-                                    choices=[e.name for e in efuses.efuses if e.read_disable_bit is not None])
+                                    choices=rd_protect_names)
 
     write_protect_efuse = subparsers.add_parser('write_protect_efuse', help='Disable writing to the efuse with the specified name')
     write_protect_efuse.add_argument('efuse_name', help='Name of efuse register to burn', nargs="+",
-                                     choices=[e.name for e in efuses.efuses if e.write_disable_bit is not None])
+                                     choices=wr_protect_names)
 
     burn_block_data = subparsers.add_parser('burn_block_data', help="Burn non-key data to EFUSE blocks. "
                                             "(Don't use this command to burn key data for Flash Encryption or Secure Boot, " +
                                             "as the byte order of keys is swapped (use burn_key)).")
     add_force_write_always(burn_block_data)
     burn_block_data.add_argument('--offset', '-o', help='Byte offset in the efuse block', type=int, default=0)
-    burn_block_data.add_argument('block', help='Efuse block to burn.', action='append', choices=efuses.BURN_BLOCK_DATA_NAMES)
-    burn_block_data.add_argument('datafile', help='File containing data to burn into the efuse block', action='append', type=argparse.FileType('rb'))
-    for _ in range(0, len(efuses.BURN_BLOCK_DATA_NAMES)):
-        burn_block_data.add_argument('block',  help='Efuse block to burn.', metavar="BLOCK", nargs="?", action='append',
-                                     choices=efuses.BURN_BLOCK_DATA_NAMES)
-        burn_block_data.add_argument('datafile', nargs="?", help='File containing data to burn into the efuse block',
-                                     metavar="DATAFILE", action='append', type=argparse.FileType('rb'))
+    burn_block_data.add_argument('block', help='Pairs of efuse block to burn and file containing data to burn into the efuse block. '
+                                 'Available the block names: {}'.format(", ".join(burn_block_names)),
+                                 action=ActionBlockDatafilePairs,
+                                 nargs="+",
+                                 metavar="BLOCK DATAFILE",
+                                 block_choices=burn_block_names)
 
     set_bit_cmd = subparsers.add_parser('burn_bit', help="Burn bit in the efuse block.")
     add_force_write_always(set_bit_cmd)
-    set_bit_cmd.add_argument('block', help='Efuse block to burn.', choices=efuses.BURN_BLOCK_DATA_NAMES)
+    set_bit_cmd.add_argument('block', help='Efuse block to burn.', choices=burn_block_names)
     set_bit_cmd.add_argument('bit_number', help='Bit number in the efuse block [0..BLK_LEN-1]', nargs="+", type=int)
 
     subparsers.add_parser('adc_info', help='Display information about ADC calibration data stored in efuse.')
@@ -110,36 +135,40 @@ def dump(esp, efuses, args):
             file_dump_name = file_dump_name[:place_for_index] + str(block.id) + file_dump_name[place_for_index:]
             print(file_dump_name)
             with open(file_dump_name, "wb") as f:
-                block.get_bitstring().byteswap()
-                block.get_bitstring().tofile(f)
+                # the bitstring holds bytes as [N]...[0], write them back as [0]...[N]
+                f.write(block.get_raw()[::-1])
 
 
 def burn_efuse(esp, efuses, args):
     def print_attention(blocked_efuses_after_burn):
         if len(blocked_efuses_after_burn):
             print("    ATTENTION! This BLOCK uses NOT the NONE coding scheme and after 'BURN', these efuses can not be burned in the feature:")
-            for i in range(0, len(blocked_efuses_after_burn), 5):
-                print("              ", "".join("{}".format(blocked_efuses_after_burn[i:i + 5:])))
+            print("\n".join("               {}".format(blocked_efuses_after_burn[i:i + 5:]) for i in range(0, len(blocked_efuses_after_burn), 5)))
 
     efuse_name_list = [name for name in args.name_value_pairs.keys()]
     burn_efuses_list = [efuses[name] for name in efuse_name_list]
-    old_value_list = [efuses[name].get_raw() for name in efuse_name_list]
+    old_value_list = [efuse.get_raw() for efuse in burn_efuses_list]
     new_value_list = [value for value in args.name_value_pairs.values()]
     util.check_duplicate_name_in_list(efuse_name_list)
 
+    burn_list_by_block = {}
+    for e in burn_efuses_list:
+        burn_list_by_block.setdefault(e.block, []).append(e)
+    names_by_block = {}
+    for e in efuses:
+        names_by_block.setdefault(e.block, []).append(e.name)
+
     attention = ""
     print("The efuses to burn:")
     for block in efuses.blocks:
-        burn_list_a_block = [e for e in burn_efuses_list if e.block == block.id]
+        burn_list_a_block = burn_list_by_block.get(block.id, [])
         if len(burn_list_a_block):
-            print("  from BLOCK%d" % (block.id))
-            for field in burn_list_a_block:
-                print("     - %s" % (field.name))
-                if efuses.blocks[field.block].get_coding_scheme() != efuses.CODING_SCHEME_NONE:
-                    using_the_same_block_names = [e.name for e in efuses if e.block == field.block]
-                    wr_names = [e.name for e in burn_list_a_block]
-                    blocked_efuses_after_burn = (list(set(using_the_same_block_names) ^ set(wr_names)))
-                    attention = " (see 'ATTENTION!' above)"
+            print("\n".join(["  from BLOCK%d" % (block.id)] + ["     - %s" % (field.name) for field in burn_list_a_block]))
+            if efuses.blocks[block.id].get_coding_scheme() != efuses.CODING_SCHEME_NONE:
+                using_the_same_block_names = names_by_block[block.id]
+                wr_names = [e.name for e in burn_list_a_block]
+                blocked_efuses_after_burn = (list(set(using_the_same_block_names) ^ set(wr_names)))
+                attention = " (see 'ATTENTION!' above)"
             if attention:
                 print_attention(blocked_efuses_after_burn)
 
@@ -169,16 +198,21 @@ def burn_efuse(esp, efuses, args):
 
 def read_protect_efuse(esp, efuses, args):
     util.check_duplicate_name_in_list(args.efuse_name)
+    efuses_by_name = {name: efuses[name] for name in args.efuse_name}
+    # group efuses which share a read disable bit
+    names_by_rd_bit = {}
+    for e in efuses:
+        names_by_rd_bit.setdefault(e.read_disable_bit, []).append(e.name)
 
     for efuse_name in args.efuse_name:
-        efuse = efuses[efuse_name]
+        efuse = efuses_by_name[efuse_name]
         if not efuse.is_readable():
             print("Efuse %s is already read protected" % efuse.name)
             return
         else:
             # make full list of which efuses will be disabled (ie share a read disable bit)
-            all_disabling = [e for e in efuses if e.read_disable_bit == efuse.read_disable_bit]
-            names = ", ".join(e.name for e in all_disabling)
+            all_disabling = names_by_rd_bit[efuse.read_disable_bit]
+            names = ", ".join(all_disabling)
             print("Permanently read-disabling efuse%s %s" % ("s" if len(all_disabling) > 1 else "", names))
             efuse.disable_read()
     efuses.burn_all()
@@ -186,7 +220,7 @@ def read_protect_efuse(esp, efuses, args):
     print("Checking efuses...")
     raise_error = False
     for efuse_name in args.efuse_name:
-        efuse = efuses[efuse_name]
+        efuse = efuses_by_name[efuse_name]
         if efuse.is_readable():
             print("Efuse %s is not read-protected." % efuse.name)
             raise_error = True
@@ -198,14 +232,20 @@ def read_protect_efuse(esp, efuses, args):
 
 def write_protect_efuse(esp, efuses, args):
     util.check_duplicate_name_in_list(args.efuse_name)
+    efuses_by_name = {name: efuses[name] for name in args.efuse_name}
+    # group efuses which share a write disable bit
+    names_by_wr_bit = {}
+    for e in efuses:
+        names_by_wr_bit.setdefault(e.write_disable_bit, []).append(e.name)
+
     for efuse_name in args.efuse_name:
-        efuse = efuses[efuse_name]
+        efuse = efuses_by_name[efuse_name]
         if not efuse.is_writeable():
             print("Efuse %s is already write protected" % efuse.name)
         else:
             # make full list of which efuses will be disabled (ie share a write disable bit)
-            all_disabling = [e for e in efuses if e.write_disable_bit == efuse.write_disable_bit]
-            names = ", ".join(e.name for e in all_disabling)
+            all_disabling = names_by_wr_bit[efuse.write_disable_bit]
+            names = ", ".join(all_disabling)
             print("Permanently write-disabling efuse%s %s" % ("s" if len(all_disabling) > 1 else "", names))
             efuse.disable_write()
     efuses.burn_all()
@@ -213,7 +253,7 @@ def write_protect_efuse(esp, efuses, args):
     print("Checking efuses...")
     raise_error = False
     for efuse_name in args.efuse_name:
-        efuse = efuses[efuse_name]
+        efuse = efuses_by_name[efuse_name]
         if efuse.is_writeable():
             print("Efuse %s is not write-protected." % efuse.name)
             raise_error = True
@@ -224,8 +264,8 @@ def write_protect_efuse(esp, efuses, args):
 
 
 def burn_block_data(esp, efuses, args):
-    block_name_list = args.block[0:len([name for name in args.block if name is not None]):]
-    datafile_list = args.datafile[0:len([name for name in args.datafile if name is not None]):]
+    block_name_list = args.block
+    datafile_list = args.datafile
     efuses.force_write_always = args.force_write_always
 
     util.check_duplicate_name_in_list(block_name_list)
@@ -247,12 +287,13 @@ def burn_block_data(esp, efuses, args):
         block = efuses.blocks[num_block]
         data = datafile.read()
         num_bytes = block.get_block_len()
-        if offset != 0:
-            data = (b'\x00' * offset) + data
-            data = data + (b'\x00' * (num_bytes - len(data)))
-        if len(data) != num_bytes:
+        if (offset + len(data) > num_bytes) or (offset == 0 and len(data) != num_bytes):
             raise esptool.FatalError("Data does not fit: the block%d size is %d bytes, data file is %d bytes, offset %d" %
                                      (block.id, num_bytes, len(data), offset))
+        if offset != 0:
+            padded_data = bytearray(num_bytes)
+            padded_data[offset:offset + len(data)] = data
+            data = bytes(padded_data)
         print("[{:02}] {:20} size={:02} bytes, offset={:02} - > [{}].".format(block.id, block.name, len(data), offset, util.hexify(data, " ")))
         block.save(data)
     efuses.burn_all()
@@ -262,16 +303,18 @@ def burn_block_data(esp, efuses, args):
 def burn_bit(esp, efuses, args):
     num_block = efuses.get_index_block_by_name(args.block)
     block = efuses.blocks[num_block]
-    data_block = BitString(block.get_block_len() * 8)
-    data_block.set(0)
-    try:
-        data_block.set(True, args.bit_number)
-    except IndexError:
-        raise esptool.FatalError("%s has bit_number in [0..%d]" % (args.block, data_block.len - 1))
-    data_block.reverse()
-    print("bit_number:   [%-03d]........................................................[0]" % (data_block.len - 1))
+    num_bytes = block.get_block_len()
+    num_bits = num_bytes * 8
+    # data is in the block.save() byte order: bit_number N is bit (N % 8) of byte (N // 8)
+    data = bytearray(num_bytes)
+    for bit_number in args.bit_number:
+        if not 0 <= bit_number < num_bits:
+            raise esptool.FatalError("%s has bit_number in [0..%d]" % (args.block, num_bits - 1))
+        data[bit_number >> 3] |= 1 << (bit_number & 7)
+    data_block = BitString(bytes=bytes(data[::-1]))
+    print("bit_number:   [%-03d]........................................................[0]" % (num_bits - 1))
     print("BLOCK%-2d   :" % block.id, data_block)
     block.print_block(data_block, "regs_to_write", debug=True)
-    block.save(data_block.bytes[::-1])
+    block.save(bytes(data))
     efuses.burn_all()
     print("Successful")
@@ -33,6 +33,12 @@ def popcnt(b):
 
 
 def check_duplicate_name_in_list(name_list):
-    duples_name = [name for i, name in enumerate(name_list) if name in name_list[:i]]
+    seen_names = set()
+    duples_name = []
+    for name in name_list:
+        if name in seen_names:
+            duples_name.append(name)
+        else:
+            seen_names.add(name)
     if duples_name != []:
         raise esptool.FatalError("Found repeated {} in the name list".format(duples_name))